@@ -8,6 +8,9 @@ import threading
 import time
 import sys
 import shutil
+import mmap
+import bisect
+import contextlib
 
 # --- 全局常量 ---
 CONFIG_FILE = "process_config.json"
@@ -15,6 +18,10 @@ LOG_FILE_TXT = "process_manager_log.txt"
 APP_ICON_FILE = "icon.ico"  # 您的应用程序图标文件名
 TEMPLATE_EXE_NAME = "_template_dummy.exe" # 您的模板EXE文件名
 MANAGED_EXES_DIR_NAME = "managed_exes" # 存放动态创建的exe的子目录名
+LOG_INDEX_SUFFIX = ".idx.json" # 历史日志索引缓存文件后缀 (与日志文件同目录)
+LOG_INDEX_VERSION = 1
+LOG_INDEX_STRIDE = 256 # 每隔多少行记录一个索引检查点
+LOG_HISTORY_PAGE_LINES = 500 # 历史日志查看器每页显示的行数
 
 # --- 尝试导入 psutil 并设置全局标志 ---
 PSUTIL_AVAILABLE = False
@@ -345,6 +352,325 @@ class ProcessFrame(tk.Frame):
             if self.process_popen: self.process_popen = None 
             if PSUTIL_AVAILABLE and self.psutil_process: self.psutil_process = None
 
+# --- 历史日志索引 (mmap + 稀疏行偏移索引) ---
+class LogHistoryIndex:
+    """为日志文件建立稀疏的 行号 -> 字节偏移/时间戳 索引，并缓存到同目录的旁路文件中。
+    每 LOG_INDEX_STRIDE 行记录一个检查点；所有读取与搜索都通过 mmap 按需进行，不会把整个日志载入内存。"""
+
+    def __init__(self, log_path, stride=LOG_INDEX_STRIDE):
+        self.log_path = os.path.abspath(log_path)
+        self.index_path = self.log_path + LOG_INDEX_SUFFIX
+        self.stride = stride
+        self._lock = threading.Lock()
+        self._reset()
+        self._load_cache()
+
+    def _reset(self):
+        self.cp_offsets = [] # 第 i 个检查点 = 第 i*stride 行的起始字节偏移
+        self.cp_times = []   # 对应行的时间戳字符串 (无法解析时为 None)
+        self.total_lines = 0 # 已索引的完整行数
+        self.indexed_size = 0 # 已索引部分的字节数 (止于最后一个换行符之后)
+        self.head_signature = "" # 文件开头若干字节 (hex)，用于识别日志被替换/截断
+
+    @staticmethod
+    def _parse_timestamp(raw):
+        # 日志行格式: "[YYYY-mm-dd HH:MM:SS] ..."
+        if len(raw) >= 21 and raw[0:1] == b"[" and raw[20:21] == b"]":
+            try: return raw[1:20].decode("ascii")
+            except UnicodeDecodeError: return None
+        return None
+
+    @contextlib.contextmanager
+    def _mapped(self):
+        with open(self.log_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b"" # 空文件无法 mmap，bytes 提供相同的 find/rfind/切片接口
+                return
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try: yield mm
+            finally: mm.close()
+
+    def _load_cache(self):
+        if not os.path.exists(self.index_path): return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f: data = json.load(f)
+            if data.get("version") != LOG_INDEX_VERSION or data.get("stride") != self.stride: return
+            self.cp_offsets = list(data["cp_offsets"]); self.cp_times = list(data["cp_times"])
+            self.total_lines = data["total_lines"]; self.indexed_size = data["indexed_size"]
+            self.head_signature = data["head_signature"]
+        except Exception as e:
+            print(f"读取日志索引缓存 '{self.index_path}' 失败，将重新建立索引: {e}")
+            self._reset()
+
+    def _save_cache(self):
+        data = {
+            "version": LOG_INDEX_VERSION, "stride": self.stride,
+            "cp_offsets": self.cp_offsets, "cp_times": self.cp_times,
+            "total_lines": self.total_lines, "indexed_size": self.indexed_size,
+            "head_signature": self.head_signature,
+        }
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f: json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"写入日志索引缓存 '{self.index_path}' 失败: {e}")
+
+    def refresh(self):
+        """增量扫描上次索引之后新追加的内容；日志被截断或替换时从头重建。返回索引是否有变化。"""
+        with self._lock:
+            if not os.path.exists(self.log_path):
+                changed = self.total_lines > 0
+                self._reset(); return changed
+            with self._mapped() as mm:
+                size = len(mm)
+                signature_bytes = bytes.fromhex(self.head_signature)
+                was_reset = size < self.indexed_size or mm[:len(signature_bytes)] != signature_bytes
+                if was_reset: self._reset()
+                if not self.head_signature: self.head_signature = mm[:64].hex()
+
+                pos, line_no = self.indexed_size, self.total_lines
+                while True:
+                    nl = mm.find(b"\n", pos)
+                    if nl < 0: break # 末尾未写完的行留到下次刷新
+                    if line_no % self.stride == 0:
+                        self.cp_offsets.append(pos)
+                        self.cp_times.append(self._parse_timestamp(mm[pos:pos + 21]))
+                    pos = nl + 1; line_no += 1
+                changed = was_reset or line_no != self.total_lines
+                self.indexed_size, self.total_lines = pos, line_no
+        if changed: self._save_cache()
+        return changed
+
+    def _check_current(self, mm):
+        # 文件在上次 refresh 之后被截断或替换时，已有偏移全部失效，不能继续按索引读取
+        if len(mm) < self.indexed_size or mm[:len(self.head_signature) // 2].hex() != self.head_signature:
+            raise OSError(f"日志文件 '{self.log_path}' 在上次建立索引后已被截断或替换，需要重新建立索引。")
+
+    def _offset_of_line(self, mm, line_no):
+        if line_no >= self.total_lines: return self.indexed_size
+        cp = line_no // self.stride
+        pos = self.cp_offsets[cp]
+        for _ in range(line_no - cp * self.stride):
+            pos = mm.find(b"\n", pos) + 1
+        return pos
+
+    def _line_of_offset(self, mm, offset):
+        cp = bisect.bisect_right(self.cp_offsets, offset) - 1
+        return cp * self.stride + mm[self.cp_offsets[cp]:offset].count(b"\n")
+
+    def read_lines(self, start_line, count):
+        """读取从 start_line (0 起) 开始的最多 count 行。"""
+        with self._lock:
+            start_line = max(0, min(start_line, self.total_lines))
+            end_line = min(self.total_lines, start_line + count)
+            if start_line >= end_line: return []
+            lines = []
+            with self._mapped() as mm:
+                self._check_current(mm)
+                pos = self._offset_of_line(mm, start_line)
+                for _ in range(end_line - start_line):
+                    nl = mm.find(b"\n", pos, self.indexed_size)
+                    if nl < 0: raise OSError(f"日志文件 '{self.log_path}' 内容与索引不一致，需要重新建立索引。")
+                    lines.append(mm[pos:nl].decode("utf-8", errors="replace").rstrip("\r"))
+                    pos = nl + 1
+            return lines
+
+    def find_line_by_time(self, time_str):
+        """返回第一条时间戳 >= time_str 的行号；time_str 可以是 'YYYY-mm-dd HH:MM:SS' 或其前缀。找不到时返回 None。"""
+        with self._lock:
+            if self.total_lines == 0: return None
+            timed_cps = [(t, i) for i, t in enumerate(self.cp_times) if t]
+            pos_in_timed = bisect.bisect_left([t for t, _ in timed_cps], time_str)
+            # 从目标时间之前的最后一个检查点开始向后逐行扫描
+            start_cp = timed_cps[pos_in_timed - 1][1] if pos_in_timed > 0 else 0
+            with self._mapped() as mm:
+                self._check_current(mm)
+                pos, line_no = self.cp_offsets[start_cp], start_cp * self.stride
+                while line_no < self.total_lines:
+                    line_time = self._parse_timestamp(mm[pos:pos + 21])
+                    if line_time and line_time >= time_str: return line_no
+                    pos = mm.find(b"\n", pos, self.indexed_size) + 1; line_no += 1
+            return None
+
+    def find_text(self, text, from_line, backwards=False):
+        """从 from_line 之后 (或之前) 查找包含 text 的下一行，返回行号；找不到时返回 None。"""
+        needle = text.encode("utf-8")
+        with self._lock:
+            if not needle or self.total_lines == 0: return None
+            with self._mapped() as mm:
+                self._check_current(mm)
+                if backwards:
+                    if from_line <= 0: return None
+                    found = mm.rfind(needle, 0, self._offset_of_line(mm, from_line))
+                else:
+                    found = mm.find(needle, self._offset_of_line(mm, max(from_line + 1, 0)), self.indexed_size)
+                return None if found < 0 else self._line_of_offset(mm, found)
+
+# --- 历史日志查看窗口 ---
+class LogHistoryWindow(tk.Toplevel):
+    def __init__(self, master, log_path=LOG_FILE_TXT, app_instance=None, *args, **kwargs):
+        super().__init__(master, *args, **kwargs)
+        self.app_instance = app_instance
+        self.title("历史日志查看器")
+        self.geometry("900x600")
+        self.index = LogHistoryIndex(log_path)
+        self.page_start = 0
+        self.highlight_line = None
+        self._refreshing_index = None # 正在后台刷新的索引对象 (None 表示空闲)
+
+        file_frame = tk.Frame(self); file_frame.pack(fill=tk.X, pady=(5,2), padx=7)
+        self.file_label = tk.Label(file_frame, text=f"文件: {self.index.log_path}", anchor="w")
+        self.file_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(file_frame, text="刷新", command=lambda: self.refresh_index()).pack(side=tk.RIGHT, padx=3)
+        tk.Button(file_frame, text="打开其他日志...", command=self.open_other_log_file).pack(side=tk.RIGHT, padx=3)
+
+        nav_frame = tk.Frame(self); nav_frame.pack(fill=tk.X, pady=2, padx=7)
+        tk.Button(nav_frame, text="首页", command=self.go_first).pack(side=tk.LEFT, padx=2)
+        tk.Button(nav_frame, text="上一页", command=self.go_prev_page).pack(side=tk.LEFT, padx=2)
+        tk.Button(nav_frame, text="下一页", command=self.go_next_page).pack(side=tk.LEFT, padx=2)
+        tk.Button(nav_frame, text="末页", command=self.go_last).pack(side=tk.LEFT, padx=2)
+        tk.Label(nav_frame, text="行号:").pack(side=tk.LEFT, padx=(12,2))
+        self.line_var = tk.StringVar()
+        line_entry = tk.Entry(nav_frame, textvariable=self.line_var, width=10); line_entry.pack(side=tk.LEFT)
+        line_entry.bind("<Return>", lambda e: self.jump_to_line_input())
+        tk.Button(nav_frame, text="跳转", command=self.jump_to_line_input).pack(side=tk.LEFT, padx=2)
+
+        search_frame = tk.Frame(self); search_frame.pack(fill=tk.X, pady=2, padx=7)
+        tk.Label(search_frame, text="时间 (YYYY-mm-dd [HH:MM[:SS]]):").pack(side=tk.LEFT, padx=(0,2))
+        self.time_var = tk.StringVar()
+        time_entry = tk.Entry(search_frame, textvariable=self.time_var, width=20); time_entry.pack(side=tk.LEFT)
+        time_entry.bind("<Return>", lambda e: self.jump_to_time_input())
+        tk.Button(search_frame, text="按时间跳转", command=self.jump_to_time_input).pack(side=tk.LEFT, padx=2)
+        tk.Label(search_frame, text="条目名称:").pack(side=tk.LEFT, padx=(12,2))
+        self.name_var = tk.StringVar()
+        name_entry = tk.Entry(search_frame, textvariable=self.name_var, width=20); name_entry.pack(side=tk.LEFT)
+        name_entry.bind("<Return>", lambda e: self.find_name(backwards=False))
+        tk.Button(search_frame, text="上一个", command=lambda: self.find_name(backwards=True)).pack(side=tk.LEFT, padx=2)
+        tk.Button(search_frame, text="下一个", command=lambda: self.find_name(backwards=False)).pack(side=tk.LEFT, padx=2)
+
+        self.status_var = tk.StringVar(value="")
+        tk.Label(self, textvariable=self.status_var, anchor="w").pack(fill=tk.X, side=tk.BOTTOM, padx=9, pady=(0,4))
+        self.text_widget = scrolledtext.ScrolledText(self, state=tk.DISABLED, wrap=tk.WORD, font=("Helvetica", 9))
+        self.text_widget.pack(fill=tk.BOTH, expand=True, padx=7, pady=5)
+        self.text_widget.tag_configure("highlight", background="yellow")
+
+        self.refresh_index(then=self._show_last_page)
+
+    @property
+    def _busy(self):
+        return self._refreshing_index is self.index
+
+    def refresh_index(self, then=None):
+        """在后台线程中增量更新索引，完成后回到UI线程执行 then (默认重新显示当前页)。"""
+        if self._busy: return
+        self._refreshing_index = self.index
+        self.status_var.set("正在建立/更新日志索引...")
+        index = self.index
+        def worker():
+            error = None
+            try: index.refresh()
+            except Exception as e: error = e
+            try: self.after(0, self._on_index_ready, index, error, then)
+            except (tk.TclError, RuntimeError): pass # 窗口或主循环已关闭
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _on_index_ready(self, index, error, then):
+        if not self.winfo_exists(): return
+        if index is not self.index: return # 刷新期间已切换到其他日志文件，丢弃过期的回调
+        self._refreshing_index = None
+        if error:
+            log(f"建立日志索引 '{index.log_path}' 失败: {error}", self.app_instance)
+            self.status_var.set(f"索引失败: {error}"); return
+        if then: then()
+        else: self.show_page(self.page_start, self.highlight_line)
+
+    def open_other_log_file(self):
+        file_path = filedialog.askopenfilename(parent=self, title="选择日志文件", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
+        if not file_path: return
+        self.index = LogHistoryIndex(file_path)
+        self.file_label.config(text=f"文件: {self.index.log_path}")
+        self.refresh_index(then=self._show_last_page)
+
+    def _on_read_error(self, error, reindex=True):
+        log(f"读取历史日志 '{self.index.log_path}' 失败: {error}", self.app_instance)
+        self.status_var.set(f"读取日志失败: {error}")
+        # 日志可能已被删除、截断或替换：重新建立索引后回到末页 (只重试一次，避免反复刷新)
+        if reindex: self.refresh_index(then=lambda: self._show_last_page(reindex_on_error=False))
+
+    def show_page(self, start_line, highlight_line=None, reindex_on_error=True):
+        total = self.index.total_lines
+        self.page_start = max(0, min(start_line, total - LOG_HISTORY_PAGE_LINES))
+        self.highlight_line = highlight_line
+        try: lines = self.index.read_lines(self.page_start, LOG_HISTORY_PAGE_LINES)
+        except Exception as e:
+            self._on_read_error(e, reindex_on_error); return
+        self.text_widget.config(state=tk.NORMAL)
+        self.text_widget.delete("1.0", tk.END)
+        self.text_widget.insert(tk.END, "\n".join(lines))
+        if highlight_line is not None and self.page_start <= highlight_line < self.page_start + len(lines):
+            row = highlight_line - self.page_start + 1
+            self.text_widget.tag_add("highlight", f"{row}.0", f"{row}.end")
+            self.text_widget.see(f"{row}.0")
+        self.text_widget.config(state=tk.DISABLED)
+        if not lines: self.status_var.set("日志为空或不存在。"); return
+        self.status_var.set(f"第 {self.page_start + 1} - {self.page_start + len(lines)} 行 / 共 {total} 行")
+
+    def go_first(self):
+        if not self._busy: self.show_page(0)
+
+    def go_prev_page(self):
+        if not self._busy: self.show_page(self.page_start - LOG_HISTORY_PAGE_LINES)
+
+    def go_next_page(self):
+        if not self._busy: self.show_page(self.page_start + LOG_HISTORY_PAGE_LINES)
+
+    def go_last(self):
+        if self._busy: return
+        if self.index.total_lines and self.page_start + LOG_HISTORY_PAGE_LINES >= self.index.total_lines:
+            self.refresh_index(then=self._show_last_page) # 已在末页时先拉取新追加的内容
+        else: self._show_last_page()
+
+    def _show_last_page(self, reindex_on_error=True):
+        self.show_page(self.index.total_lines - LOG_HISTORY_PAGE_LINES, reindex_on_error=reindex_on_error)
+        self.text_widget.see(tk.END)
+
+    def _jump_to(self, line_no):
+        self.show_page(line_no - LOG_HISTORY_PAGE_LINES // 4, highlight_line=line_no)
+
+    def jump_to_line_input(self):
+        if self._busy: return
+        try: line_no = int(self.line_var.get().strip()) - 1
+        except ValueError:
+            messagebox.showwarning("输入警告", "请输入有效的行号。", parent=self); return
+        self._jump_to(max(0, min(line_no, self.index.total_lines - 1)))
+
+    def jump_to_time_input(self):
+        if self._busy: return
+        raw = self.time_var.get().strip()
+        for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+            try: target = datetime.datetime.strptime(raw, fmt).strftime("%Y-%m-%d %H:%M:%S"); break
+            except ValueError: continue
+        else:
+            messagebox.showwarning("输入警告", "时间格式应为 YYYY-mm-dd、YYYY-mm-dd HH:MM 或 YYYY-mm-dd HH:MM:SS。", parent=self); return
+        try: line_no = self.index.find_line_by_time(target)
+        except Exception as e:
+            self._on_read_error(e); return
+        if line_no is None: self.status_var.set(f"没有 {target} 之后的日志记录。"); return
+        self._jump_to(line_no)
+
+    def find_name(self, backwards=False):
+        if self._busy: return
+        name = self.name_var.get().strip()
+        if not name: messagebox.showwarning("输入警告", "请输入要查找的条目名称。", parent=self); return
+        from_line = self.highlight_line if self.highlight_line is not None else \
+            (self.page_start + LOG_HISTORY_PAGE_LINES if backwards else self.page_start - 1)
+        try: line_no = self.index.find_text(name, from_line, backwards=backwards)
+        except Exception as e:
+            self._on_read_error(e); return
+        if line_no is None: self.status_var.set(f"{'之前' if backwards else '之后'}没有包含 '{name}' 的日志行。"); return
+        self._jump_to(line_no)
+
 # --- 主应用程序类 ---
 class ProcessManagerApp(tk.Tk):
     def __init__(self):
@@ -354,6 +680,7 @@ class ProcessManagerApp(tk.Tk):
         self.minsize(800, 500) 
         self.process_frames_list = []
         self.is_app_running = True
+        self.log_history_window = None
 
         if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
             self.app_base_dir = os.path.dirname(sys.executable)
@@ -372,6 +699,7 @@ class ProcessManagerApp(tk.Tk):
         tk.Button(top_btn_frame, text="+ 添加进程", command=self.add_new_process_frame_gui).pack(side=tk.LEFT, padx=3)
         tk.Button(top_btn_frame, text="导入 TXT", command=self.import_from_txt_file).pack(side=tk.LEFT, padx=3)
         tk.Button(top_btn_frame, text="保存配置", command=self.save_configuration).pack(side=tk.LEFT, padx=3)
+        tk.Button(top_btn_frame, text="历史日志", command=self.open_log_history_viewer).pack(side=tk.LEFT, padx=3)
         self.exit_button = tk.Button(top_btn_frame, text="退出程序", command=self.quit_application_confirmed, fg="red")
         self.exit_button.pack(side=tk.RIGHT, padx=3)
         
@@ -443,6 +771,12 @@ class ProcessManagerApp(tk.Tk):
             self.log_text_widget.see(tk.END)
             self.log_text_widget.config(state=tk.DISABLED)
 
+    def open_log_history_viewer(self):
+        if self.log_history_window and self.log_history_window.winfo_exists():
+            self.log_history_window.deiconify(); self.log_history_window.lift(); return
+        log("打开历史日志查看器。", self)
+        self.log_history_window = LogHistoryWindow(self, LOG_FILE_TXT, app_instance=self)
+
     def add_new_process_frame_gui(self, name="", minimized=False):
         frame = ProcessFrame(self.scrollable_content_frame, name, minimized, app_instance=self)
         frame.pack(fill=tk.X, padx=5, pady=3, anchor="n")